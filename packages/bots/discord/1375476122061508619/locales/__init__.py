@@ -1,5 +1,7 @@
 import json
 import os
+import sys
+from functools import lru_cache
 from typing import Dict, Any
 
 
@@ -57,5 +59,15 @@ def get_localization() -> Localization:
     return _instance
 
 
+@lru_cache(maxsize=16384)
+def _t_cached(key: str, lang: str) -> str:
+    return get_localization().get(key, lang)
+
+
 def t(key: str, lang: str = None, **kwargs) -> str:
-    return get_localization().get(key, lang, **kwargs)
+    # Le traduzioni con parametri vengono formattate ogni volta
+    if kwargs:
+        return get_localization().get(key, lang, **kwargs)
+    if lang is None:
+        lang = get_localization().default_lang
+    return _t_cached(sys.intern(key), sys.intern(lang))
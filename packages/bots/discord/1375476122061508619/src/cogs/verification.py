@@ -673,12 +673,7 @@ class VerificationCog(BaseCog, InteractionHandler):
         except Exception as e:
             self.logger.warning(f"Could not get alliance suggestions: {e}")
         
-        view = AllianceNameModal(
-            callback=self._handle_alliance_name_submission,
-            lang=lang
-        )
-        
-        # Create button to open modal
+        # Create button to open modal (modal is built on click)
         enter_btn = ui.Button(
             label=t("alliance.enter_name_button", lang),
             emoji="✏️",
@@ -692,7 +687,8 @@ class VerificationCog(BaseCog, InteractionHandler):
             
             modal = AllianceNameModal(
                 callback=self._handle_alliance_name_submission,
-                lang=lang
+                lang=lang,
+                defer_mode="thinking"
             )
             await interaction.response.send_modal(modal)
         
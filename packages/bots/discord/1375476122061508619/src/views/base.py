@@ -43,6 +43,7 @@ class BaseView(ui.View):
         logger: Logger instance for this view
         _interaction_count: Number of interactions processed
         _last_interaction: Timestamp of last interaction
+        _buttons: Buttons currently attached to the view
     """
     
     def __init__(
@@ -63,6 +64,32 @@ class BaseView(ui.View):
         self.logger = logging.getLogger(f"view.{self.__class__.__name__}")
         self._interaction_count = 0
         self._last_interaction: Optional[datetime] = None
+        # Buttons tracked separately so callbacks can skip isinstance scans
+        self._buttons: List[ui.Button] = [
+            item for item in self.children if isinstance(item, ui.Button)
+        ]
+    
+    def add_item(self, item: ui.Item) -> "BaseView":
+        """Add an item to the view, tracking buttons in ``_buttons``."""
+        super().add_item(item)
+        if isinstance(item, ui.Button):
+            self._buttons.append(item)
+        return self
+    
+    def remove_item(self, item: ui.Item) -> "BaseView":
+        """Remove an item from the view, keeping ``_buttons`` in sync."""
+        super().remove_item(item)
+        try:
+            self._buttons.remove(item)
+        except ValueError:
+            pass
+        return self
+    
+    def clear_items(self) -> "BaseView":
+        """Remove all items from the view."""
+        super().clear_items()
+        self._buttons.clear()
+        return self
     
     async def interaction_check(self, interaction: discord.Interaction) -> bool:
         """Check if the interaction is valid."""
@@ -331,7 +358,8 @@ class BaseModal(ui.Modal):
         *,
         title: str,
         lang: str = "en",
-        custom_id: Optional[str] = None
+        custom_id: Optional[str] = None,
+        defer_mode: str = "defer"
     ):
         # Generate a default custom_id if not provided
         if custom_id is None:
@@ -341,6 +369,19 @@ class BaseModal(ui.Modal):
         self.lang = lang
         self.logger = logging.getLogger(f"modal.{self.__class__.__name__}")
         self._submitted = False
+        # How to acknowledge a submission before handing off to a callback:
+        # "none" (callback sends the initial response), "defer" (silent ACK)
+        # or "thinking" (ephemeral "thinking..." ACK for slow callbacks)
+        self.defer_mode = defer_mode
+    
+    async def acknowledge(self, interaction: discord.Interaction):
+        """Acknowledge the submission according to ``defer_mode``."""
+        if self.defer_mode == "none" or interaction.response.is_done():
+            return
+        if self.defer_mode == "thinking":
+            await interaction.response.defer(thinking=True, ephemeral=True)
+        else:
+            await interaction.response.defer()
     
     async def on_submit(self, interaction: discord.Interaction):
         """Handle modal submission."""
@@ -6,28 +6,66 @@ import discord
 from discord import ui
 from typing import Optional, Callable, List, Dict, Any
 import asyncio
+import copy
+import sys
+from functools import lru_cache
 
 from src.views.base import BaseView, BaseModal, ConfirmationView
 from src.config import Config
 from locales import t
 
+# Button styles bound once at import time for the button tables and callbacks
+_PRI = discord.ButtonStyle.primary
+_SEC = discord.ButtonStyle.secondary
+_SUC = discord.ButtonStyle.success
+_DAN = discord.ButtonStyle.danger
+_GRAY = discord.ButtonStyle.gray
+
+
+# Raw language table: (flag emoji, native name, language code)
+_LANGUAGES = (
+    ("🇬🇧", "English", "en"),
+    ("🇮🇹", "Italiano", "it"),
+    ("🇰🇷", "한국어", "ko"),
+    ("🇨🇳", "中文", "zh"),
+    ("🇯🇵", "日本語", "ja"),
+    ("🇸🇦", "العربية", "ar"),
+    ("🇪🇸", "Español", "es"),
+    ("🇩🇪", "Deutsch", "de"),
+    ("🇫🇷", "Français", "fr"),
+    ("🇷🇺", "Русский", "ru"),
+    ("🇺🇦", "Українська", "uk")
+)
+
+# One style per row of 4 buttons: primary, secondary, then success
+_LANGUAGE_ROW_STYLES = (
+    _PRI,
+    _SEC,
+    _SUC
+)
+
+# Prebuilt button specs: (code, label, custom_id, style, row)
+_LANGUAGE_BUTTONS = tuple(
+    (
+        sys.intern(code),
+        f"{emoji} {label}",
+        sys.intern(f"lang_{code}"),
+        _LANGUAGE_ROW_STYLES[i // 4],
+        i // 4
+    )
+    for i, (emoji, label, code) in enumerate(_LANGUAGES)
+)
+
+# custom_id -> language code, for the shared button callback
+_LANGUAGE_BY_CUSTOM_ID = {
+    custom_id: code for code, _, custom_id, _, _ in _LANGUAGE_BUTTONS
+}
+
 
 class LanguageSelectionView(BaseView):
     """View for selecting user language with flag emojis and better layout."""
     
-    LANGUAGES = [
-        ("🇬🇧", "English", "en"),
-        ("🇮🇹", "Italiano", "it"),
-        ("🇰🇷", "한국어", "ko"),
-        ("🇨🇳", "中文", "zh"),
-        ("🇯🇵", "日本語", "ja"),
-        ("🇸🇦", "العربية", "ar"),
-        ("🇪🇸", "Español", "es"),
-        ("🇩🇪", "Deutsch", "de"),
-        ("🇫🇷", "Français", "fr"),
-        ("🇷🇺", "Русский", "ru"),
-        ("🇺🇦", "Українська", "uk")
-    ]
+    LANGUAGES = _LANGUAGES
     
     def __init__(
         self,
@@ -43,46 +81,55 @@ class LanguageSelectionView(BaseView):
     
     def _create_buttons(self):
         """Create language buttons in a grid layout with enhanced styling."""
-        for i, (emoji, label, code) in enumerate(self.LANGUAGES):
-            # Use different button styles for variety
-            if i < 4:  # First row - primary colors
-                style = discord.ButtonStyle.primary
-            elif i < 8:  # Second row - secondary colors  
-                style = discord.ButtonStyle.secondary
-            else:  # Third row - success colors
-                style = discord.ButtonStyle.success
-                
+        for _, label, custom_id, style, row in _LANGUAGE_BUTTONS:
             button = ui.Button(
-                label=f"{emoji} {label}",
+                label=label,
                 style=style,
-                custom_id=f"lang_{code}",
-                row=i // 4  # 4 buttons per row for better layout
+                custom_id=custom_id,
+                row=row  # 4 buttons per row for better layout
             )
-            button.callback = self._make_callback(code)
+            button.callback = self._on_language
             self.add_item(button)
     
-    def _make_callback(self, lang_code: str):
-        """Create callback for language button."""
-        async def callback(interaction: discord.Interaction):
-            # Update button states
-            for item in self.children:
-                if isinstance(item, ui.Button):
-                    if item.custom_id == f"lang_{lang_code}":
-                        item.style = discord.ButtonStyle.success
-                        item.disabled = True
-                    else:
-                        item.disabled = True
-            
-            # Update message
-            await interaction.response.edit_message(view=self)
-            
-            # Call the callback
-            if self.callback:
-                await self.callback(interaction, lang_code)
-            
-            self.stop()
-        
-        return callback
+    async def _on_language(self, interaction: discord.Interaction):
+        """Handle a click on any language button."""
+        my_cid = sys.intern(interaction.data['custom_id'])
+        lang_code = _LANGUAGE_BY_CUSTOM_ID[my_cid]
+        
+        # Update button states
+        for item in self._buttons:
+            if item.custom_id == my_cid:
+                item.style = _SUC
+            item.disabled = True
+        
+        # Update message
+        await interaction.response.edit_message(view=self)
+        
+        # Call the callback
+        if self.callback:
+            await self.callback(interaction, lang_code)
+        
+        self.stop()
+
+
+@lru_cache(maxsize=32)
+def _game_id_modal_strings(lang: str) -> Dict[str, str]:
+    """Rendered GameIDModal strings for a language (static per language)."""
+    return {
+        "title": t("verification.enter_id_title", lang),
+        "label": t("verification.game_id_label", lang),
+        "placeholder": t("verification.game_id_placeholder", lang),
+    }
+
+
+@lru_cache(maxsize=32)
+def _alliance_name_modal_strings(lang: str) -> Dict[str, str]:
+    """Rendered AllianceNameModal strings for a language (static per language)."""
+    return {
+        "title": t("alliance.enter_name_title", lang),
+        "label": t("alliance.name_label", lang),
+        "placeholder": t("alliance.name_placeholder", lang),
+    }
 
 
 class GameIDModal(BaseModal):
@@ -96,8 +143,9 @@ class GameIDModal(BaseModal):
         max_length: int = 20,
         **kwargs
     ):
+        strings = _game_id_modal_strings(kwargs.get('lang', 'en'))
         super().__init__(
-            title=t("verification.enter_id_title", kwargs.get('lang', 'en')),
+            title=strings["title"],
             custom_id="game_id_modal",
             **kwargs
         )
@@ -105,8 +153,8 @@ class GameIDModal(BaseModal):
         
         # Game ID input
         self.game_id = ui.TextInput(
-            label=t("verification.game_id_label", self.lang),
-            placeholder=t("verification.game_id_placeholder", self.lang),
+            label=strings["label"],
+            placeholder=strings["placeholder"],
             min_length=min_length,
             max_length=max_length,
             required=True
@@ -116,7 +164,7 @@ class GameIDModal(BaseModal):
     async def handle_submit(self, interaction: discord.Interaction):
         """Handle modal submission."""
         if self.callback:
-            await interaction.response.defer()
+            await self.acknowledge(interaction)
             await self.callback(interaction, self.game_id.value.strip())
 
 
@@ -141,7 +189,7 @@ class VerificationMethodView(BaseView):
             manual_btn = ui.Button(
                 label=t("verification.manual_method", self.lang),
                 emoji="✍️",
-                style=discord.ButtonStyle.primary,
+                style=_PRI,
                 custom_id="manual"
             )
             manual_btn.callback = self._manual_callback
@@ -152,7 +200,7 @@ class VerificationMethodView(BaseView):
             api_btn = ui.Button(
                 label=t("verification.api_method", self.lang),
                 emoji="🔗",
-                style=discord.ButtonStyle.secondary,
+                style=_SEC,
                 custom_id="api"
             )
             api_btn.callback = self._api_callback
@@ -162,7 +210,7 @@ class VerificationMethodView(BaseView):
         help_btn = ui.Button(
             label=t("buttons.help", self.lang),
             emoji="❓",
-            style=discord.ButtonStyle.secondary,
+            style=_SEC,
             custom_id="help"
         )
         help_btn.callback = self._help_callback
@@ -221,7 +269,7 @@ class GameIDVerificationView(BaseView):
         # Enter ID button - main action
         self.enter_id_btn = ui.Button(
             label=f"🎮 {t('verification.enter_id', self.lang)}",
-            style=discord.ButtonStyle.success,  # Green for main action
+            style=_SUC,  # Green for main action
             custom_id="enter_id",
             row=0
         )
@@ -231,7 +279,7 @@ class GameIDVerificationView(BaseView):
         # Tutorial button - helpful secondary action
         tutorial_btn = ui.Button(
             label=f"📖 {t('verification.show_tutorial', self.lang)}",
-            style=discord.ButtonStyle.primary,  # Blue for help
+            style=_PRI,  # Blue for help
             custom_id="tutorial",
             row=0
         )
@@ -242,7 +290,7 @@ class GameIDVerificationView(BaseView):
         if Config.ALLOW_SKIP_VERIFICATION:
             skip_btn = ui.Button(
                 label=f"⏭️ {t('buttons.skip', self.lang)}",
-                style=discord.ButtonStyle.gray,  # Gray for skip
+                style=_GRAY,  # Gray for skip
                 custom_id="skip",
                 row=1
             )
@@ -251,9 +299,11 @@ class GameIDVerificationView(BaseView):
     
     async def _enter_id_callback(self, interaction: discord.Interaction):
         """Handle enter ID button."""
+        # ID verification calls the game API, so show a "thinking" ACK
         modal = GameIDModal(
             lang=self.lang,
-            callback=self._handle_id_submission
+            callback=self._handle_id_submission,
+            defer_mode="thinking"
         )
         await interaction.response.send_modal(modal)
     
@@ -272,6 +322,9 @@ class GameIDVerificationView(BaseView):
     
     async def _skip_callback(self, interaction: discord.Interaction):
         """Handle skip button."""
+        # ACK first so the click never waits on the confirmation round trip
+        await interaction.response.defer()
+        
         # Show confirmation
         confirm_embed = discord.Embed(
             title=t("verification.skip_confirm_title", self.lang),
@@ -284,16 +337,39 @@ class GameIDVerificationView(BaseView):
             user_id=self.user_id
         )
         
-        await interaction.response.send_message(
-            embed=confirm_embed,
-            view=confirm_view,
-            ephemeral=True
-        )
+        # Freeze the parent view while the user decides; only edit if needed
+        previous_state = [item.disabled for item in self._buttons]
+        freeze = not all(previous_state)
+        if freeze:
+            self.disable_all_items()
+            await asyncio.gather(
+                self.update_message(view=self),
+                interaction.followup.send(
+                    embed=confirm_embed,
+                    view=confirm_view,
+                    ephemeral=True,
+                    wait=True
+                )
+            )
+        else:
+            await interaction.followup.send(
+                embed=confirm_embed,
+                view=confirm_view,
+                ephemeral=True,
+                wait=True
+            )
         
         await confirm_view.wait()
         
         if confirm_view.value and self.callback:
             await self.callback(interaction, None)
+        elif freeze and confirm_view.value is False and not self.is_finished():
+            # Cancelled: restore the previous button states. On a confirmation
+            # timeout this view has already timed out (its timer restarted at
+            # the skip click), so re-enabling would only leave dead buttons
+            for item, disabled in zip(self._buttons, previous_state):
+                item.disabled = disabled
+            await self.update_message(view=self)
     
     async def _tutorial_callback(self, interaction: discord.Interaction):
         """Show tutorial for finding game ID."""
@@ -335,7 +411,7 @@ class AllianceTypeButton(ui.Button):
         label: str,
         emoji: str,
         description: str,
-        style: discord.ButtonStyle = discord.ButtonStyle.primary,
+        style: discord.ButtonStyle = _PRI,
         callback: Optional[Callable] = None
     ):
         super().__init__(
@@ -350,20 +426,55 @@ class AllianceTypeButton(ui.Button):
     
     async def callback(self, interaction: discord.Interaction):
         """Handle button click."""
-        # Show description
+        # Show description as the interaction ACK; ephemeral messages are
+        # dismissable by the user, so no delayed DELETE is scheduled
         embed = discord.Embed(
             title=self.label,
             description=self.description,
             color=Config.EMBED_COLOR
         )
         
-        await interaction.response.send_message(embed=embed, ephemeral=True, delete_after=5)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
         
         # Call the callback
         if self._callback:
             await self._callback(interaction, self.alliance_type)
 
 
+# Alliance type buttons:
+# (alliance_type, label emoji, emoji, style, label key, description key)
+_ALLIANCE_BUTTONS = (
+    # Alliance member - main option, green for recommended
+    ("alliance", "🏰", "⚔️", _SUC,
+     "alliance.type_alliance", "alliance.type_alliance_description"),
+    # No alliance - independent option, blue for alternative
+    ("no_alliance", "🚶‍♂️", "🎯", _PRI,
+     "alliance.type_no_alliance", "alliance.type_no_alliance_description"),
+    # Other state - special case, gray for less common option
+    ("other_state", "🌍", "🗺️", _GRAY,
+     "alliance.type_other_state", "alliance.type_other_state_description")
+)
+
+
+@lru_cache(maxsize=32)
+def _alliance_button_kwargs(lang: str) -> tuple:
+    """Rendered AllianceTypeButton kwargs for a language.
+    
+    The returned dicts are shared between callers and must not be mutated.
+    """
+    return tuple(
+        {
+            "alliance_type": alliance_type,
+            "label": f"{label_emoji} {t(label_key, lang)}",
+            "emoji": emoji,
+            "description": t(description_key, lang),
+            "style": style
+        }
+        for alliance_type, label_emoji, emoji, style, label_key, description_key
+        in _ALLIANCE_BUTTONS
+    )
+
+
 class AllianceSelectionView(BaseView):
     """View for selecting alliance type."""
     
@@ -378,38 +489,11 @@ class AllianceSelectionView(BaseView):
         super().__init__(**kwargs)
         self.callback = callback
         
-        # Alliance member button - main option
-        alliance_btn = AllianceTypeButton(
-            alliance_type="alliance",
-            label=f"🏰 {t('alliance.type_alliance', self.lang)}",
-            emoji="⚔️",
-            description=t("alliance.type_alliance_description", self.lang),
-            style=discord.ButtonStyle.success,  # Green for recommended option
-            callback=self._handle_selection
-        )
-        self.add_item(alliance_btn)
-        
-        # No alliance button - independent option
-        no_alliance_btn = AllianceTypeButton(
-            alliance_type="no_alliance",
-            label=f"🚶‍♂️ {t('alliance.type_no_alliance', self.lang)}",
-            emoji="🎯",
-            description=t("alliance.type_no_alliance_description", self.lang),
-            style=discord.ButtonStyle.primary,  # Blue for alternative
-            callback=self._handle_selection
-        )
-        self.add_item(no_alliance_btn)
-        
-        # Other state button - special case
-        other_state_btn = AllianceTypeButton(
-            alliance_type="other_state",
-            label=f"🌍 {t('alliance.type_other_state', self.lang)}",
-            emoji="🗺️",
-            description=t("alliance.type_other_state_description", self.lang),
-            style=discord.ButtonStyle.gray,  # Gray for less common option
-            callback=self._handle_selection
-        )
-        self.add_item(other_state_btn)
+        for button_kwargs in _alliance_button_kwargs(self.lang):
+            self.add_item(AllianceTypeButton(
+                callback=self._handle_selection,
+                **button_kwargs
+            ))
     
     async def _handle_selection(self, interaction: discord.Interaction, alliance_type: str):
         """Handle alliance type selection."""
@@ -417,9 +501,9 @@ class AllianceSelectionView(BaseView):
         self.disable_all_items()
         
         # Update the selected button
-        for item in self.children:
-            if isinstance(item, AllianceTypeButton) and item.alliance_type == alliance_type:
-                item.style = discord.ButtonStyle.success
+        for item in self._buttons:
+            if item.alliance_type == alliance_type:
+                item.style = _SUC
         
         await self.update_message(view=self)
         
@@ -439,19 +523,20 @@ class AllianceNameModal(BaseModal):
         suggestions: Optional[List[str]] = None,
         **kwargs
     ):
+        strings = _alliance_name_modal_strings(kwargs.get('lang', 'en'))
         super().__init__(
-            title=t("alliance.enter_name_title", kwargs.get('lang', 'en')),
+            title=strings["title"],
             **kwargs
         )
         self.callback = callback
         
         # Alliance name input
-        placeholder = t("alliance.name_placeholder", self.lang)
+        placeholder = strings["placeholder"]
         if suggestions:
             placeholder += f" ({', '.join(suggestions[:3])}...)"
         
         self.alliance_name = ui.TextInput(
-            label=t("alliance.name_label", self.lang),
+            label=strings["label"],
             placeholder=placeholder,
             min_length=2,
             max_length=50,
@@ -462,20 +547,41 @@ class AllianceNameModal(BaseModal):
     async def handle_submit(self, interaction: discord.Interaction):
         """Handle modal submission."""
         if self.callback:
-            await interaction.response.defer()
+            await self.acknowledge(interaction)
             await self.callback(interaction, self.alliance_name.value.strip())
 
 
+# Raw role table: (role, emoji, button style, title)
+_ROLES = (
+    ("R5", "👑", _DAN, "Leader"),      # Leader - Red
+    ("R4", "⚔️", _PRI, "Officer"),    # Officer - Blue
+    ("R3", "🛡️", _SUC, "Elite"),     # Elite - Green
+    ("R2", "⚡", _SEC, "Veteran"),  # Veteran - Gray
+    ("R1", "🌱", _SEC, "Member")    # Member - Gray
+)
+
+# Prebuilt button specs: (role, label, custom_id, style, row)
+_ROLE_BUTTONS = tuple(
+    (
+        sys.intern(role),
+        f"{emoji} {role} - {title}",
+        sys.intern(f"role_{role}"),
+        style,
+        0 if role in ("R5", "R4") else 1  # Leadership roles on top row
+    )
+    for role, emoji, style, title in _ROLES
+)
+
+# custom_id -> role, for the shared button callback
+_ROLE_BY_CUSTOM_ID = {
+    custom_id: role for role, _, custom_id, _, _ in _ROLE_BUTTONS
+}
+
+
 class AllianceRoleSelectionView(BaseView):
     """View for selecting alliance role (R1-R5)."""
     
-    ROLES = [
-        ("R5", "👑", discord.ButtonStyle.danger, "Leader"),      # Leader - Red
-        ("R4", "⚔️", discord.ButtonStyle.primary, "Officer"),    # Officer - Blue  
-        ("R3", "🛡️", discord.ButtonStyle.success, "Elite"),     # Elite - Green
-        ("R2", "⚡", discord.ButtonStyle.secondary, "Veteran"),  # Veteran - Gray
-        ("R1", "🌱", discord.ButtonStyle.secondary, "Member")    # Member - Gray
-    ]
+    ROLES = _ROLES
     
     def __init__(
         self,
@@ -491,34 +597,74 @@ class AllianceRoleSelectionView(BaseView):
     
     def _create_role_buttons(self):
         """Create role selection buttons with enhanced styling."""
-        for role, emoji, style, title in self.ROLES:
+        for _, label, custom_id, style, row in _ROLE_BUTTONS:
             button = ui.Button(
-                label=f"{emoji} {role} - {title}",
+                label=label,
                 style=style,
-                custom_id=f"role_{role}",
-                row=0 if role in ["R5", "R4"] else 1  # Leadership roles on top row
+                custom_id=custom_id,
+                row=row
             )
-            button.callback = self._make_callback(role)
+            button.callback = self._on_role
             self.add_item(button)
     
-    def _make_callback(self, role: str):
-        """Create callback for role button."""
-        async def callback(interaction: discord.Interaction):
-            # Update button states
-            for item in self.children:
-                if isinstance(item, ui.Button):
-                    if item.custom_id == f"role_{role}":
-                        item.style = discord.ButtonStyle.success
-                    item.disabled = True
-            
-            await interaction.response.edit_message(view=self)
-            
-            if self.callback:
-                await self.callback(interaction, role)
-            
-            self.stop()
-        
-        return callback
+    async def _on_role(self, interaction: discord.Interaction):
+        """Handle a click on any role button."""
+        my_cid = sys.intern(interaction.data['custom_id'])
+        role = _ROLE_BY_CUSTOM_ID[my_cid]
+        
+        # Update button states
+        for item in self._buttons:
+            if item.custom_id == my_cid:
+                item.style = _SUC
+            item.disabled = True
+        
+        await interaction.response.edit_message(view=self)
+        
+        if self.callback:
+            await self.callback(interaction, role)
+        
+        self.stop()
+
+
+# Commands listed in the welcome help embed: (command, description key)
+_HELP_COMMANDS = (
+    ("/dashboard", "commands.dashboard_description"),
+    ("/events", "commands.events_description"),
+    ("/alliance", "commands.alliance_description"),
+    ("/profile", "commands.profile_description"),
+    ("/help", "commands.help_description")
+)
+
+
+@lru_cache(maxsize=32)
+def _help_command_list(lang: str) -> tuple:
+    """Translated (command, description) pairs for a language."""
+    return tuple((cmd, t(key, lang)) for cmd, key in _HELP_COMMANDS)
+
+
+@lru_cache(maxsize=32)
+def _welcome_help_embed_dict(lang: str) -> Dict[str, Any]:
+    """Serialized welcome help embed for a language (static per language).
+    
+    The returned dict is shared between callers and must not be mutated;
+    deep-copy it before handing it to ``Embed.from_dict``, which keeps
+    references to its nested ``fields`` list.
+    """
+    embed = discord.Embed(
+        title=t("help.welcome_title", lang),
+        description=t("help.welcome_description", lang),
+        color=Config.EMBED_COLOR
+    )
+    
+    # Add command list
+    for cmd, desc in _help_command_list(lang):
+        embed.add_field(
+            name=cmd,
+            value=desc,
+            inline=False
+        )
+    
+    return embed.to_dict()
 
 
 class VerificationCompleteView(BaseView):
@@ -539,7 +685,7 @@ class VerificationCompleteView(BaseView):
         if show_dashboard:
             dashboard_btn = ui.Button(
                 label=f"🎛️ {t('buttons.open_dashboard', self.lang)}",
-                style=discord.ButtonStyle.success,  # Green for main action
+                style=_SUC,  # Green for main action
                 custom_id="dashboard",
                 row=0
             )
@@ -550,7 +696,7 @@ class VerificationCompleteView(BaseView):
         if show_help:
             help_btn = ui.Button(
                 label=f"❓ {t('buttons.get_help', self.lang)}",
-                style=discord.ButtonStyle.primary,  # Blue for help
+                style=_PRI,  # Blue for help
                 custom_id="help",
                 row=0
             )
@@ -560,7 +706,7 @@ class VerificationCompleteView(BaseView):
         # Close button - dismiss action
         close_btn = ui.Button(
             label=f"✅ {t('buttons.close', self.lang)}",
-            style=discord.ButtonStyle.gray,  # Gray for close
+            style=_GRAY,  # Gray for close
             custom_id="close",
             row=1
         )
@@ -581,28 +727,8 @@ class VerificationCompleteView(BaseView):
     
     async def _help_callback(self, interaction: discord.Interaction):
         """Show help information."""
-        embed = discord.Embed(
-            title=t("help.welcome_title", self.lang),
-            description=t("help.welcome_description", self.lang),
-            color=Config.EMBED_COLOR
-        )
-        
-        # Add command list
-        commands = [
-            ("/dashboard", t("commands.dashboard_description", self.lang)),
-            ("/events", t("commands.events_description", self.lang)),
-            ("/alliance", t("commands.alliance_description", self.lang)),
-            ("/profile", t("commands.profile_description", self.lang)),
-            ("/help", t("commands.help_description", self.lang))
-        ]
-        
-        for cmd, desc in commands:
-            embed.add_field(
-                name=cmd,
-                value=desc,
-                inline=False
-            )
-        
+        # from_dict doesn't copy, so give it a private copy of the cached dict
+        embed = discord.Embed.from_dict(copy.deepcopy(_welcome_help_embed_dict(self.lang)))
         await interaction.response.send_message(embed=embed, ephemeral=True)
     
     async def _close_callback(self, interaction: discord.Interaction):
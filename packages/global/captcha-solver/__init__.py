@@ -6,6 +6,7 @@ from the Whiteout Survival game's gift code redemption system.
 
 Main components:
 - CaptchaSolver: Main class for inference
+- get_solver: Cached CaptchaSolver factory for reuse across solves
 - CaptchaDataset: PyTorch dataset for training
 - CaptchaCNN: Neural network architecture
 - train_model: Training function
@@ -23,9 +24,9 @@ __version__ = "1.0.0"
 __author__ = "Whiteout Survival Bot Team"
 
 # Package-level imports for convenience
-from .captcha_solver import CaptchaSolver
-from .dataset import CaptchaDataset, get_dataloader
+from .captcha_solver import CaptchaSolver, get_solver
+from .dataset import CaptchaDataset, get_dataset, get_dataloader
 from .model import CaptchaCNN
 from .train import train_model
 
-__all__ = ['CaptchaSolver', 'CaptchaDataset', 'CaptchaCNN', 'train_model', 'get_dataloader']
\ No newline at end of file
+__all__ = ['CaptchaSolver', 'get_solver', 'CaptchaDataset', 'CaptchaCNN', 'train_model', 'get_dataset', 'get_dataloader']
\ No newline at end of file
@@ -7,12 +7,19 @@ and confidence scoring.
 """
 
 import torch
-from PIL import Image
-from torchvision import transforms
-import string
+import torch.nn.functional as F
+from torchvision.io import decode_image, read_file, ImageReadMode
+import asyncio
+import functools
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from model import CaptchaCNN
+from preprocessing import CHARS, CHAR_TO_IDX, IDX_TO_CHAR, IMAGE_SIZE, MEAN, STD, TRANSFORM
 import os
 
+__all__ = ['CaptchaSolver', 'get_solver']
+
 
 class CaptchaSolver:
     """
@@ -24,42 +31,218 @@ class CaptchaSolver:
     Attributes:
         model: Trained CaptchaCNN model
         device: CPU or CUDA device for inference
-        transform: Image preprocessing pipeline
+        transform: PIL preprocessing pipeline used in training. Kept for
+                   callers that preprocess images themselves; solve() and
+                   solve_batch() do not use it (see _prepare_batch)
     """
     
-    def __init__(self, model_path='best_captcha_model.pth'):
+    # Fixed input shape the model was trained on: (batch, channels, height, width)
+    INPUT_SHAPE = (1, 3) + IMAGE_SIZE
+    
+    # Training-only PIL pipeline, exposed for external callers; inference
+    # decodes and normalizes on the device instead
+    transform = TRANSFORM
+    
+    def __init__(self, model_path='best_captcha_model.pth', use_torchscript=True, quantize=False,
+                 num_threads=None, cuda_graph=False, pooled_fc=None,
+                 batch_norm=None):
         """
         Initialize the CAPTCHA solver with a trained model.
         
         Args:
             model_path (str): Path to the saved model weights
+            use_torchscript (bool): Trace and freeze the model with TorchScript
+                                    so inference is dispatched from C++ (default: True)
+            quantize (bool): Apply dynamic INT8 quantization to the fully
+                             connected layers; CPU only (default: False)
+            num_threads (int, optional): Intra-op CPU threads for PyTorch. Use 1
+                                         when several solves run concurrently via
+                                         solve_async, to avoid oversubscription.
+                                         Note this is a process-wide setting.
+            cuda_graph (bool): Capture a CUDA graph of the single-image forward
+                               pass and replay it in solve(); CUDA only (default: False)
+            pooled_fc (bool, optional): Whether the checkpoint uses CaptchaCNN's
+                                        pooled FC bottleneck. None detects it
+                                        from the checkpoint keys (default: None)
+            batch_norm (bool, optional): Whether the checkpoint uses CaptchaCNN's
+                                         BatchNorm layers. None detects it from
+                                         the checkpoint keys (default: None)
         """
         # Set device for inference (GPU if available)
         self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
         
+        if num_threads is not None:
+            torch.set_num_threads(num_threads)
+        
         # Define character set and mappings
-        self.chars = string.ascii_lowercase + string.digits  # a-z + 0-9
-        self.char_to_idx = {char: idx for idx, char in enumerate(self.chars)}
-        self.idx_to_char = {idx: char for idx, char in enumerate(self.chars)}
+        self.chars = CHARS  # a-z + 0-9
+        self.char_to_idx = CHAR_TO_IDX
+        self.idx_to_char = IDX_TO_CHAR
+        self._chars_tuple = tuple(self.chars)
         
-        # Load model architecture and weights
-        self.model = CaptchaCNN(num_chars=36, max_length=5).to(self.device)
-        self.model.load_state_dict(torch.load(model_path, map_location=self.device))
+        # Normalization folded with the /255 scaling of ToTensor, on device
+        self._mean = torch.tensor(MEAN, device=self.device).view(1, 3, 1, 1) * 255
+        self._std = torch.tensor(STD, device=self.device).view(1, 3, 1, 1) * 255
+        
+        # Load weights, then build the matching architecture
+        state_dict = torch.load(model_path, map_location=self.device)
+        if pooled_fc is None:
+            pooled_fc = 'fc.weight' in state_dict
+        if batch_norm is None:
+            batch_norm = 'bn1.weight' in state_dict
+        self.model = CaptchaCNN(num_chars=36, max_length=5, pooled_fc=pooled_fc,
+                                batch_norm=batch_norm).to(self.device)
+        # Checkpoints may store FP16 weights (see train_model); run in FP32
+        self.model.load_state_dict({k: v.float() if v.is_floating_point() else v
+                                    for k, v in state_dict.items()})
         self.model.eval()  # Set to evaluation mode
+        # Plain FP32 module for export; the quantized/traced forms below
+        # use ops (quantized::linear_dynamic, MKLDNN) ONNX cannot express
+        self._eager_model = self.model
+        
+        # INT8 weights for the FC-heavy path when running on CPU
+        if quantize and self.device.type == 'cpu':
+            self.model = self._quantize_model(self.model)
+        
+        # Trace once at load time; the traced graph is frozen and fused
+        if use_torchscript:
+            self.model = self._compile_model(self.model)
+        
+        # Pay cuDNN autotuning / TorchScript profiling cost now, not on the first solve
+        self._warmup()
+        
+        # Optional CUDA graph for the fixed single-image input shape
+        self._graph = None
+        self._graph_lock = threading.Lock()
+        if cuda_graph and self.device.type == 'cuda':
+            self._capture_cuda_graph()
+    
+    @torch.inference_mode()
+    def _warmup(self, iterations=3):
+        """
+        Run a few dummy forward passes so the first real solve is not slowed
+        down by kernel selection and graph optimization.
+        
+        Args:
+            iterations (int): Number of warmup forward passes (default: 3)
+        """
+        example = torch.zeros(self.INPUT_SHAPE, device=self.device)
+        for _ in range(iterations):
+            self.model(example)
+        if self.device.type == 'cuda':
+            torch.cuda.synchronize(self.device)
+    
+    @torch.inference_mode()
+    def _capture_cuda_graph(self):
+        """
+        Capture the single-image forward pass into a CUDA graph.
+        
+        The graph reads from ``_static_input`` and writes to
+        ``_static_output``; replaying it launches every kernel at once.
+        """
+        self._static_input = torch.zeros(self.INPUT_SHAPE, device=self.device)
+        
+        # Warm up on a side stream, as required before capture
+        stream = torch.cuda.Stream(device=self.device)
+        stream.wait_stream(torch.cuda.current_stream(self.device))
+        with torch.cuda.stream(stream):
+            for _ in range(3):
+                self.model(self._static_input)
+        torch.cuda.current_stream(self.device).wait_stream(stream)
+        
+        graph = torch.cuda.CUDAGraph()
+        with torch.cuda.graph(graph):
+            self._static_output = self.model(self._static_input)
+        self._graph = graph
+    
+    def _forward(self, batch):
+        """
+        Run the model, replaying the CUDA graph for single-image inputs.
+        
+        Args:
+            batch (torch.Tensor): Preprocessed input of shape (N, 3, 64, 160)
+            
+        Returns:
+            torch.Tensor: Output of shape (N, max_length, num_chars)
+        """
+        if self._graph is None or tuple(batch.shape) != self.INPUT_SHAPE:
+            return self.model(batch)
+        # The static buffers are shared, so replays must not interleave
+        with self._graph_lock:
+            self._static_input.copy_(batch)
+            self._graph.replay()
+            return self._static_output.clone()
+    
+    def _quantize_model(self, model):
+        """
+        Dynamically quantize the model's Linear layers to INT8.
+        
+        Weights are stored as INT8 and activations are quantized on the fly,
+        so no calibration data is needed. On x86 the fbgemm engine is
+        selected so the INT8 kernels can use VNNI instructions.
         
-        # Define image preprocessing (same as training)
-        self.transform = transforms.Compose([
-            transforms.Resize((64, 160)),
-            transforms.ToTensor(),
-            transforms.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225])
-        ])
+        Args:
+            model (nn.Module): Model in evaluation mode on CPU
+            
+        Returns:
+            nn.Module: Quantized model
+        """
+        if 'fbgemm' in torch.backends.quantized.supported_engines:
+            torch.backends.quantized.engine = 'fbgemm'
+        return torch.ao.quantization.quantize_dynamic(
+            model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+    
+    def _compile_model(self, model):
+        """
+        Trace the model with TorchScript and optimize it for inference.
+        
+        Args:
+            model (nn.Module): Model in evaluation mode
+            
+        Returns:
+            torch.jit.ScriptModule: Frozen, inference-optimized model
+        """
+        example = torch.zeros(self.INPUT_SHAPE, device=self.device)
+        with torch.no_grad():
+            traced = torch.jit.trace(model, example)
+        return torch.jit.optimize_for_inference(traced)
+    
+    def export_onnx(self, output_path='captcha_model.onnx', opset_version=17):
+        """
+        Export the model to ONNX for serving with ONNX Runtime.
+        
+        The eager FP32 CaptchaCNN is exported, regardless of whether the
+        solver itself runs a quantized or TorchScript model. The batch
+        dimension is exported as dynamic so the same file serves single
+        solves and batches.
+        
+        Args:
+            output_path (str): Destination path for the ONNX file
+            opset_version (int): ONNX opset to target (default: 17)
+            
+        Returns:
+            str: Path of the exported file
+        """
+        example = torch.zeros(self.INPUT_SHAPE, device=self.device)
+        torch.onnx.export(
+            self._eager_model,
+            example,
+            output_path,
+            opset_version=opset_version,
+            input_names=['input'],
+            output_names=['output'],
+            dynamic_axes={'input': {0: 'batch'}, 'output': {0: 'batch'}}
+        )
+        return output_path
     
+    @torch.inference_mode()
     def solve(self, image_path, expected_length=None):
         """
         Solve a single CAPTCHA image.
         
         Args:
-            image_path (str): Path to the CAPTCHA image
+            image_path (str or bytes): Path to the CAPTCHA image or its encoded bytes
             expected_length (int, optional): Expected length of CAPTCHA text.
                                            If None, length is determined automatically.
         
@@ -68,39 +251,41 @@ class CaptchaSolver:
                 - predicted_text (str): Predicted CAPTCHA text
                 - confidence_scores (list): Confidence score for each character
         """
-        # Load and preprocess image
-        image = Image.open(image_path).convert('RGB')
-        image = self.transform(image).unsqueeze(0).to(self.device)
+        # Decode on CPU, preprocess on the inference device
+        image = self._prepare_batch([self._decode_image(image_path)])
         
-        # Run inference
-        with torch.no_grad():
-            outputs = self.model(image)  # Shape: (1, max_length, num_chars)
-            
-        prediction = []
-        confidences = []
+        # Run inference (autograd, view tracking and version counters
+        # are disabled by the inference_mode decorator)
+        outputs = self._forward(image)  # Shape: (1, max_length, num_chars)
+        # Softmax and best character for every position at once
+        top_conf, top_idx = outputs[0].softmax(-1).max(-1)
         
-        # Process predictions for each position
-        max_len = expected_length if expected_length else 5
+        # Single device-to-host transfer for all positions
+        return self._postprocess(top_idx.tolist(), top_conf.tolist(), expected_length)
+    
+    async def solve_async(self, image_path, expected_length=None):
+        """
+        Solve a CAPTCHA without blocking the asyncio event loop.
         
-        for i in range(max_len):
-            # Apply softmax to get probabilities
-            probs = torch.softmax(outputs[0, i], dim=0)
-            # Get most likely character
-            char_idx = torch.argmax(probs).item()
-            confidence = probs[char_idx].item()
-            
-            prediction.append(self.idx_to_char[char_idx])
-            confidences.append(confidence)
+        Inference runs in a worker thread via asyncio.to_thread, so callers
+        such as Discord coroutines keep processing other events meanwhile.
+        On CUDA each call uses its own stream so concurrent solves can overlap.
         
-        # Dynamic length detection based on confidence
-        if not expected_length:
-            avg_confidence = sum(confidences) / len(confidences)
-            # If 5th character has significantly lower confidence, assume 4-char CAPTCHA
-            if len(confidences) > 4 and confidences[4] < avg_confidence * 0.7:
-                prediction = prediction[:4]
-                confidences = confidences[:4]
-        
-        return ''.join(prediction), confidences
+        Args:
+            image_path (str or bytes): Path to the CAPTCHA image or its encoded bytes
+            expected_length (int, optional): Expected length of CAPTCHA text
+            
+        Returns:
+            tuple: (predicted_text, confidence_scores), as returned by solve()
+        """
+        return await asyncio.to_thread(self._solve_threaded, image_path, expected_length)
+    
+    def _solve_threaded(self, image_path, expected_length=None):
+        """Run solve() from a worker thread, on a dedicated CUDA stream if available."""
+        if self.device.type != 'cuda':
+            return self.solve(image_path, expected_length)
+        with torch.cuda.stream(torch.cuda.Stream(device=self.device)):
+            return self.solve(image_path, expected_length)
     
     def solve_dict(self, image_path, expected_length=None):
         """
@@ -110,7 +295,7 @@ class CaptchaSolver:
         a dictionary format as shown in the README examples.
         
         Args:
-            image_path (str): Path to the CAPTCHA image
+            image_path (str or bytes): Path to the CAPTCHA image or its encoded bytes
             expected_length (int, optional): Expected length of CAPTCHA text
             
         Returns:
@@ -119,34 +304,169 @@ class CaptchaSolver:
         text, confidence = self.solve(image_path, expected_length)
         return {'text': text, 'confidence': confidence}
     
-    def solve_batch(self, image_paths):
+    def _decode_image(self, image):
+        """
+        Decode a CAPTCHA into a (3, H, W) uint8 RGB tensor on CPU.
+        
+        Args:
+            image (str or bytes): Path to the image or its encoded bytes
+            
+        Returns:
+            torch.Tensor: Decoded image tensor
+        """
+        if isinstance(image, (bytes, bytearray, memoryview)):
+            data = torch.frombuffer(bytearray(image), dtype=torch.uint8)
+        else:
+            data = read_file(image)
+        return decode_image(data, mode=ImageReadMode.RGB)
+    
+    def _prepare_batch(self, images):
+        """
+        Move decoded images to the device, resize and normalize them there.
+        
+        Args:
+            images (list): Decoded (3, H, W) uint8 tensors
+            
+        Returns:
+            torch.Tensor: Model input of shape (N, 3, 64, 160)
+        """
+        size = self.INPUT_SHAPE[2:]
+        if any(img.shape != images[0].shape for img in images):
+            # Mixed sizes cannot be stacked before resizing
+            return torch.cat([self._prepare_batch([img]) for img in images])
+        
+        batch = torch.stack(images)
+        if self.device.type == 'cuda':
+            batch = batch.pin_memory()
+        batch = batch.to(self.device, non_blocking=True).float()
+        
+        # Most CAPTCHAs already have the training size; skip the resize then
+        if tuple(batch.shape[-2:]) != size:
+            batch = F.interpolate(
+                batch, size=size, mode='bilinear', align_corners=False, antialias=True
+            )
+        return (batch - self._mean) / self._std
+    
+    def _postprocess(self, char_indices, confidences, expected_length=None):
+        """
+        Turn per-position predictions into text, applying length detection.
+        
+        Args:
+            char_indices (list): Predicted character index for each position
+            confidences (list): Confidence score for each position
+            expected_length (int, optional): Expected length of CAPTCHA text
+            
+        Returns:
+            tuple: (predicted_text, confidence_scores)
+        """
+        max_len = expected_length if expected_length else 5
+        prediction = [self._chars_tuple[idx] for idx in char_indices[:max_len]]
+        confidences = confidences[:max_len]
+        
+        # Dynamic length detection based on confidence
+        if not expected_length:
+            avg_confidence = sum(confidences) / len(confidences)
+            # If 5th character has significantly lower confidence, assume 4-char CAPTCHA
+            if len(confidences) > 4 and confidences[4] < avg_confidence * 0.7:
+                prediction = prediction[:4]
+                confidences = confidences[:4]
+        
+        return ''.join(prediction), confidences
+    
+    def solve_batch(self, image_paths, batch_size=32):
         """
         Solve multiple CAPTCHA images in batch.
         
+        Images are decoded in a thread pool and run through the model
+        ``batch_size`` at a time, so each chunk costs a single forward
+        pass and a single device-to-host copy. The next chunk is decoded
+        while the current one runs through the model.
+        
         Args:
             image_paths (list): List of paths to CAPTCHA images
+            batch_size (int): Number of images per forward pass (default: 32)
             
         Returns:
             list: List of dictionaries containing results for each image
                   Format: {'path': str, 'prediction': str, 'confidence': list}
                   or {'path': str, 'error': str} if processing fails
         """
-        results = []
-        for path in image_paths:
+        results = [None] * len(image_paths)
+        
+        def load(path):
             try:
-                result, confidence = self.solve(path)
-                results.append({
-                    'path': path,
-                    'prediction': result,
-                    'confidence': confidence
-                })
+                return self._decode_image(path), None
             except Exception as e:
-                results.append({
-                    'path': path,
-                    'error': str(e)
-                })
+                return None, e
+        
+        with ThreadPoolExecutor() as executor:
+            # executor.map submits every decode up front, so the next chunk
+            # decodes in the background while the current one is inferred
+            pending = executor.map(load, image_paths[:batch_size])
+            for start in range(0, len(image_paths), batch_size):
+                chunk = image_paths[start:start + batch_size]
+                decoded = list(pending)
+                next_start = start + batch_size
+                if next_start < len(image_paths):
+                    pending = executor.map(load, image_paths[next_start:next_start + batch_size])
+                
+                tensors = []
+                positions = []
+                
+                # Decode images in parallel; failures are reported per image
+                for offset, (tensor, error) in enumerate(decoded):
+                    if error is not None:
+                        results[start + offset] = {
+                            'path': chunk[offset],
+                            'error': str(error)
+                        }
+                    else:
+                        tensors.append(tensor)
+                        positions.append(start + offset)
+                
+                if not tensors:
+                    continue
+                
+                batch = self._prepare_batch(tensors)
+                
+                # Single forward pass for the whole chunk
+                with torch.inference_mode():
+                    outputs = self._forward(batch)  # Shape: (N, max_length, num_chars)
+                    probs = torch.softmax(outputs, dim=2)
+                    top_conf, top_idx = probs.max(dim=2)
+                
+                # One device-to-host transfer for the whole chunk
+                conf_rows = top_conf.tolist()
+                idx_rows = top_idx.tolist()
+                
+                for pos, idx_row, conf_row in zip(positions, idx_rows, conf_rows):
+                    text, confidence = self._postprocess(idx_row, conf_row)
+                    results[pos] = {
+                        'path': image_paths[pos],
+                        'prediction': text,
+                        'confidence': confidence
+                    }
+        
         return results
 
+@functools.lru_cache(maxsize=4)
+def get_solver(model_path='best_captcha_model.pth'):
+    """
+    Return a shared CaptchaSolver for the given model, loading it on first use.
+    
+    Loading the weights and tracing the model is the expensive part of
+    solving a CAPTCHA, so callers should reuse this instance instead of
+    constructing a new CaptchaSolver per solve.
+    
+    Args:
+        model_path (str): Path to the saved model weights
+        
+    Returns:
+        CaptchaSolver: Cached solver instance
+    """
+    return CaptchaSolver(model_path)
+
+
 def test_solver():
     """
     Test the CAPTCHA solver on all images in the letters directory.
@@ -155,18 +475,21 @@ def test_solver():
     runs predictions, and compares them with the ground truth
     (extracted from filenames).
     """
-    # Initialize solver with best model
-    solver = CaptchaSolver()
+    # Get the shared solver with best model
+    solver = get_solver()
 
     letters_dir = 'letters'
     
     # Get all test images
-    test_images = [
-        f'{letters_dir}/{f}' for f in os.listdir(letters_dir)
-        if f.endswith('.png') or f.endswith('.jpg')
-    ]
+    with os.scandir(letters_dir) as entries:
+        test_images = sorted(
+            f'{letters_dir}/{entry.name}' for entry in entries
+            if entry.name.endswith(('.png', '.jpg')) and entry.is_file()
+        )
 
     counter = 0  # Track correct predictions
+    lines = []  # Report is buffered and written once at the end
+    separator = "-" * 50
 
     # Process each test image
     for img_path in test_images:
@@ -180,23 +503,26 @@ def test_solver():
             if len(prediction) > len(actual):
                 prediction = prediction[:len(actual)]
 
-            # Display results
-            print(f"Image: {img_path}")
-            print(f"Actual: {actual}")
-            print(f"Predicted: {prediction}")
-            print(f"Confidence: {[f'{c:.3f}' for c in confidence]}")
-            print(f"Correct: {prediction.lower() == actual.lower()}")
-            print("-" * 50)
+            correct = prediction.lower() == actual.lower()
+
+            # Collect results
+            lines.append(f"Image: {img_path}")
+            lines.append(f"Actual: {actual}")
+            lines.append(f"Predicted: {prediction}")
+            lines.append(f"Confidence: [{', '.join(f'{c:.3f}' for c in confidence)}]")
+            lines.append(f"Correct: {correct}")
+            lines.append(separator)
 
             # Count correct predictions
-            if prediction.lower() == actual.lower():
+            if correct:
                 counter += 1
         except Exception as e:
-            print(f"Error processing {img_path}: {e}")
+            lines.append(f"Error processing {img_path}: {e}")
 
-    # Print summary
-    print(f"Total correct predictions: {counter}/{len(test_images)}")
-    print(f"Accuracy: {counter/len(test_images)*100:.2f}%")
+    # Summary
+    lines.append(f"Total correct predictions: {counter}/{len(test_images)}")
+    lines.append(f"Accuracy: {counter/len(test_images)*100:.2f}%")
+    sys.stdout.write('\n'.join(lines) + '\n')
 
 if __name__ == "__main__":
     # Run test on all images when executed directly
@@ -5,12 +5,27 @@ This module handles loading CAPTCHA images from disk, encoding labels,
 and preparing data for training the neural network.
 """
 
+import numpy as np
 import torch
 from torch.utils.data import Dataset, DataLoader
 from PIL import Image
 import os
-import string
-from torchvision import transforms
+from preprocessing import CHARS, CHAR_TO_IDX, IDX_TO_CHAR, TRANSFORM
+
+__all__ = ['CaptchaDataset', 'get_dataset', 'get_dataloader', 'loader_kwargs', 'IGNORE_INDEX', 'IMAGE_EXTENSIONS']
+
+
+# File extensions recognized as CAPTCHA images
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+# Target value skipped by nn.CrossEntropyLoss (its default ignore_index)
+IGNORE_INDEX = -100
+
+
+# ASCII code -> class index lookup table; characters outside the set map to IGNORE_INDEX
+_CHAR_IDX_TABLE = np.full(128, IGNORE_INDEX, dtype=np.int64)
+for _char, _idx in CHAR_TO_IDX.items():
+    _CHAR_IDX_TABLE[ord(_char)] = _idx
 
 
 class CaptchaDataset(Dataset):
@@ -18,7 +33,7 @@ class CaptchaDataset(Dataset):
     PyTorch Dataset for loading and preprocessing CAPTCHA images.
     
     This dataset expects images to be named with their labels (e.g., '2a3bc.png')
-    and converts them to one-hot encoded tensors for training.
+    and converts them to tensors of class indices for training.
     
     Args:
         data_dir (str): Directory containing CAPTCHA images
@@ -32,14 +47,21 @@ class CaptchaDataset(Dataset):
         self.max_length = max_length
         
         # Define character set: lowercase letters (a-z) + digits (0-9)
-        self.chars = string.ascii_lowercase + string.digits  # Total: 36 characters
+        self.chars = CHARS  # Total: 36 characters
         
-        # Create bidirectional mappings between characters and indices
-        self.char_to_idx = {char: idx for idx, char in enumerate(self.chars)}
-        self.idx_to_char = {idx: char for idx, char in enumerate(self.chars)}
+        # Bidirectional mappings between characters and indices
+        self.char_to_idx = CHAR_TO_IDX
+        self.idx_to_char = IDX_TO_CHAR
+        self._chars_tuple = tuple(self.chars)
+        self.num_chars = len(self.chars)
         
-        # Get all image files from the data directory
-        self.image_files = [f for f in os.listdir(data_dir) if f.endswith(('.png', '.jpg', '.jpeg'))]
+        # Get all image files from the data directory, sorted so that
+        # seeded shuffles and splits are reproducible across filesystems
+        with os.scandir(data_dir) as entries:
+            self.image_files = sorted(
+                entry.name for entry in entries
+                if entry.name.endswith(IMAGE_EXTENSIONS) and entry.is_file()
+            )
         
     def __len__(self):
         """Return the total number of images in the dataset."""
@@ -55,7 +77,8 @@ class CaptchaDataset(Dataset):
         Returns:
             tuple: (image_tensor, encoded_label, actual_length)
                 - image_tensor: Preprocessed image as tensor
-                - encoded_label: One-hot encoded label tensor of shape (max_length, num_chars)
+                - encoded_label: Class index tensor of shape (max_length,), padded
+                                 (and unknown characters marked) with IGNORE_INDEX
                 - actual_length: Actual length of the CAPTCHA text
         """
         img_name = self.image_files[idx]
@@ -71,12 +94,13 @@ class CaptchaDataset(Dataset):
         # Extract label from filename (e.g., '2a3bc.png' -> '2a3bc')
         label = os.path.splitext(img_name)[0].lower()
         
-        # Create one-hot encoded label tensor
-        # Shape: (max_length, num_chars) where each position has one hot value
-        encoded_label = torch.zeros(self.max_length, len(self.chars))
-        for i, char in enumerate(label):
-            if i < self.max_length and char in self.char_to_idx:
-                encoded_label[i, self.char_to_idx[char]] = 1
+        # Encode label as class indices, shape (max_length,), translating the
+        # whole label with one table lookup (non-ASCII characters become '?')
+        # Positions past the label end are padded with IGNORE_INDEX
+        codes = np.frombuffer(label[:self.max_length].encode('ascii', 'replace'), dtype=np.uint8)
+        indices = np.full(self.max_length, IGNORE_INDEX, dtype=np.int64)
+        indices[:len(codes)] = _CHAR_IDX_TABLE[codes]
+        encoded_label = torch.from_numpy(indices)
         
         return image, encoded_label, len(label)
     
@@ -91,36 +115,74 @@ class CaptchaDataset(Dataset):
         Returns:
             str: Decoded CAPTCHA text
         """
-        pred_chars = []
-        for i in range(length):
-            # Get the character with highest probability for each position
-            char_idx = torch.argmax(prediction[i]).item()
-            pred_chars.append(self.idx_to_char[char_idx])
-        return ''.join(pred_chars)
+        # Character with highest probability for each position, one host sync
+        char_indices = prediction[:length].argmax(dim=-1).tolist()
+        return ''.join([self._chars_tuple[idx] for idx in char_indices])
+
+def loader_kwargs(num_workers=None):
+    """
+    DataLoader keyword arguments for parallel, prefetching data loading.
+    
+    Args:
+        num_workers (int, optional): Number of loader worker processes
+                                     (default: min(4, os.cpu_count()))
+                                     
+    Returns:
+        dict: Keyword arguments for torch.utils.data.DataLoader
+    """
+    # A handful of workers keeps up with ~1k small images; one per core
+    # would just spawn long-lived processes that sit idle
+    if num_workers is None:
+        num_workers = min(4, os.cpu_count() or 1)
+    
+    kwargs = {
+        'num_workers': num_workers,
+        'pin_memory': torch.cuda.is_available()
+    }
+    # Worker-only options are rejected by DataLoader when num_workers == 0
+    if num_workers > 0:
+        kwargs['persistent_workers'] = True
+    return kwargs
 
-def get_dataloader(data_dir, batch_size=32, shuffle=True):
+def get_dataset(data_dir):
+    """
+    Create the CAPTCHA dataset with standard preprocessing, without a DataLoader.
+    
+    Use this when the dataset is split or wrapped before loading, so no
+    loader (and no worker processes) is built only to be discarded.
+    
+    Args:
+        data_dir (str): Directory containing CAPTCHA images
+        
+    Returns:
+        CaptchaDataset: Dataset using the shared preprocessing pipeline
+    """
+    # Shared image preprocessing pipeline (see preprocessing.py)
+    return CaptchaDataset(data_dir, transform=TRANSFORM)
+
+
+def get_dataloader(data_dir, batch_size=32, shuffle=True, num_workers=None):
     """
     Create a DataLoader for the CAPTCHA dataset with standard preprocessing.
     
+    Images are decoded by worker processes that stay alive across epochs and
+    prefetch batches into pinned memory (when CUDA is available), so image
+    decoding overlaps with GPU compute.
+    
     Args:
         data_dir (str): Directory containing CAPTCHA images
         batch_size (int): Number of images per batch (default: 32)
         shuffle (bool): Whether to shuffle the data (default: True)
+        num_workers (int, optional): Number of loader worker processes
+                                     (default: min(4, os.cpu_count()))
         
     Returns:
         tuple: (dataloader, dataset)
             - dataloader: PyTorch DataLoader instance
             - dataset: CaptchaDataset instance
     """
-    # Define image preprocessing pipeline
-    transform = transforms.Compose([
-        transforms.Resize((64, 160)),  # Resize to fixed dimensions
-        transforms.ToTensor(),         # Convert PIL image to tensor
-        # Normalize using ImageNet statistics for better convergence
-        transforms.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225])
-    ])
-    
-    dataset = CaptchaDataset(data_dir, transform=transform)
-    dataloader = DataLoader(dataset, batch_size=batch_size, shuffle=shuffle)
+    dataset = get_dataset(data_dir)
+    dataloader = DataLoader(dataset, batch_size=batch_size, shuffle=shuffle,
+                            **loader_kwargs(num_workers))
     
     return dataloader, dataset
\ No newline at end of file
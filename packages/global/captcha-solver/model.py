@@ -3,13 +3,15 @@ Neural Network Model for CAPTCHA Recognition
 
 This module defines the CNN architecture used for solving CAPTCHAs.
 The model uses convolutional layers to extract features from CAPTCHA images
-and separate output heads for each character position.
+and a fused output layer holding one head per character position.
 """
 
 import torch
 import torch.nn as nn
 import torch.nn.functional as F
 
+__all__ = ['CaptchaCNN', 'fuse_char_output_heads']
+
 
 class CaptchaCNN(nn.Module):
     """
@@ -17,27 +19,46 @@ class CaptchaCNN(nn.Module):
     
     Architecture:
     - 4 convolutional layers with increasing channels (32->64->128->256)
+    - Optional BatchNorm after each convolutional layer
     - MaxPooling after each convolutional layer
-    - 2 fully connected layers (1024->512 units)
-    - Separate output heads for each character position
+    - 2 fully connected layers (1024->512 units), or with ``pooled_fc`` a
+      per-position average pool followed by a single 512-unit layer
+    - Per-position output heads fused into a single Linear layer
     - Dropout for regularization
     
     Args:
         num_chars (int): Number of possible characters (default: 36 for a-z + 0-9)
         max_length (int): Maximum CAPTCHA length (default: 5)
+        pooled_fc (bool): Replace the 10M-parameter ``fc1``/``fc2`` stack with
+                          ``adaptive_avg_pool2d(x, (1, max_length))`` and one
+                          ``Linear(256*max_length, 512)`` (default: False, so
+                          existing checkpoints keep loading)
+        batch_norm (bool): Normalize each conv output with BatchNorm2d, which
+                           tolerates larger learning rates and converges in
+                           fewer epochs (default: False, for the same reason)
     """
     
-    def __init__(self, num_chars=36, max_length=5):
+    def __init__(self, num_chars=36, max_length=5, pooled_fc=False, batch_norm=False):
         super(CaptchaCNN, self).__init__()
         self.num_chars = num_chars
         self.max_length = max_length
+        self.pooled_fc = pooled_fc
         
         # Convolutional layers with increasing filter sizes
         # Input: 3 channels (RGB), Output: progressively more feature maps
-        self.conv1 = nn.Conv2d(3, 32, kernel_size=3, padding=1)
-        self.conv2 = nn.Conv2d(32, 64, kernel_size=3, padding=1)
-        self.conv3 = nn.Conv2d(64, 128, kernel_size=3, padding=1)
-        self.conv4 = nn.Conv2d(128, 256, kernel_size=3, padding=1)
+        # (the bias is redundant when BatchNorm follows)
+        self.conv1 = nn.Conv2d(3, 32, kernel_size=3, padding=1, bias=not batch_norm)
+        self.conv2 = nn.Conv2d(32, 64, kernel_size=3, padding=1, bias=not batch_norm)
+        self.conv3 = nn.Conv2d(64, 128, kernel_size=3, padding=1, bias=not batch_norm)
+        self.conv4 = nn.Conv2d(128, 256, kernel_size=3, padding=1, bias=not batch_norm)
+        
+        # Batch normalization per conv stage; Identity keeps the default
+        # model's state dict unchanged
+        norm = nn.BatchNorm2d if batch_norm else (lambda _: nn.Identity())
+        self.bn1 = norm(32)
+        self.bn2 = norm(64)
+        self.bn3 = norm(128)
+        self.bn4 = norm(256)
         
         # Pooling layer reduces spatial dimensions by factor of 2
         self.pool = nn.MaxPool2d(2, 2)
@@ -45,16 +66,25 @@ class CaptchaCNN(nn.Module):
         # Dropout for regularization during training
         self.dropout = nn.Dropout(0.3)
         
-        # Fully connected layers
-        # Input size: 256 channels * 4 height * 10 width (after 4 pooling operations on 64x160 input)
-        self.fc1 = nn.Linear(256 * 4 * 10, 1024)
-        self.fc2 = nn.Linear(1024, 512)
+        if pooled_fc:
+            # Pool each feature map down to one column per character position,
+            # keeping the left-to-right layout the position heads rely on
+            self.fc = nn.Linear(256 * max_length, 512)
+        else:
+            # Fully connected layers
+            # Input size: 256 channels * 4 height * 10 width (after 4 pooling operations on 64x160 input)
+            self.fc1 = nn.Linear(256 * 4 * 10, 1024)
+            self.fc2 = nn.Linear(1024, 512)
         
-        # Separate output head for each character position
-        # This allows the model to learn position-specific patterns
-        self.char_outputs = nn.ModuleList([
-            nn.Linear(512, num_chars) for _ in range(max_length)
-        ])
+        # Output heads for every character position fused into a single layer
+        # Rows [i*num_chars:(i+1)*num_chars] form the head for position i,
+        # so the model still learns position-specific patterns in one GEMM
+        self.char_output = nn.Linear(512, num_chars * max_length)
+    
+    def _load_from_state_dict(self, state_dict, prefix, *args, **kwargs):
+        """Accept checkpoints saved with the old per-position ``char_outputs`` heads."""
+        fuse_char_output_heads(state_dict, self.max_length, prefix)
+        super()._load_from_state_dict(state_dict, prefix, *args, **kwargs)
         
     def forward(self, x):
         """
@@ -69,24 +99,54 @@ class CaptchaCNN(nn.Module):
         """
         # Apply convolutional layers with ReLU activation and pooling
         # Each pooling reduces dimensions by factor of 2
-        x = self.pool(F.relu(self.conv1(x)))  # -> (batch, 32, 32, 80)
-        x = self.pool(F.relu(self.conv2(x)))  # -> (batch, 64, 16, 40)
-        x = self.pool(F.relu(self.conv3(x)))  # -> (batch, 128, 8, 20)
-        x = self.pool(F.relu(self.conv4(x)))  # -> (batch, 256, 4, 10)
-        
-        # Flatten the feature maps for fully connected layers
-        x = x.view(x.size(0), -1)  # -> (batch, 256*4*10)
+        x = self.pool(F.relu(self.bn1(self.conv1(x))))  # -> (batch, 32, 32, 80)
+        x = self.pool(F.relu(self.bn2(self.conv2(x))))  # -> (batch, 64, 16, 40)
+        x = self.pool(F.relu(self.bn3(self.conv3(x))))  # -> (batch, 128, 8, 20)
+        x = self.pool(F.relu(self.bn4(self.conv4(x))))  # -> (batch, 256, 4, 10)
         
-        # Apply fully connected layers with dropout
-        x = F.relu(self.fc1(x))    # -> (batch, 1024)
-        x = self.dropout(x)
-        x = F.relu(self.fc2(x))    # -> (batch, 512)
-        x = self.dropout(x)
+        if self.pooled_fc:
+            x = F.adaptive_avg_pool2d(x, (1, self.max_length)).flatten(1)  # -> (batch, 256*max_length)
+            x = F.relu(self.fc(x))     # -> (batch, 512)
+            x = self.dropout(x)
+        else:
+            # Flatten the feature maps for fully connected layers
+            x = x.flatten(1)           # -> (batch, 256*4*10)
+            
+            # Apply fully connected layers with dropout
+            x = F.relu(self.fc1(x))    # -> (batch, 1024)
+            x = self.dropout(x)
+            x = F.relu(self.fc2(x))    # -> (batch, 512)
+            x = self.dropout(x)
         
-        # Generate predictions for each character position
-        outputs = []
-        for i in range(self.max_length):
-            outputs.append(self.char_outputs[i](x))  # -> (batch, num_chars)
+        # Generate predictions for all character positions at once
+        # and reshape to (batch, max_length, num_chars)
+        return self.char_output(x).view(-1, self.max_length, self.num_chars)
+
+
+def fuse_char_output_heads(state_dict, max_length=5, prefix=''):
+    """
+    Migrate a state dict from per-position heads to the fused output layer.
+    
+    Older checkpoints store one ``char_outputs.{i}`` Linear per position;
+    their weights and biases are concatenated along the output dimension
+    into ``char_output``. The dict is modified in place and returned;
+    state dicts that are already fused are left untouched.
+    
+    Args:
+        state_dict (dict): Model state dict
+        max_length (int): Number of character positions (default: 5)
+        prefix (str): Key prefix of the model inside the state dict
         
-        # Stack outputs to create tensor of shape (batch, max_length, num_chars)
-        return torch.stack(outputs, dim=1)
\ No newline at end of file
+    Returns:
+        dict: The migrated state dict
+    """
+    old_key = f'{prefix}char_outputs.{{}}.{{}}'
+    if old_key.format(0, 'weight') not in state_dict:
+        return state_dict
+    
+    for param in ('weight', 'bias'):
+        state_dict[f'{prefix}char_output.{param}'] = torch.cat(
+            [state_dict.pop(old_key.format(i, param)) for i in range(max_length)],
+            dim=0
+        )
+    return state_dict
\ No newline at end of file
@@ -0,0 +1,34 @@
+"""
+Shared Preprocessing Constants for CAPTCHA Recognition
+
+This module defines the character set, image size and preprocessing
+pipeline shared by training (dataset.py) and inference (captcha_solver.py),
+so both sides are built once and can never drift apart.
+"""
+
+import string
+from torchvision import transforms
+
+__all__ = ['CHARS', 'CHAR_TO_IDX', 'IDX_TO_CHAR', 'IMAGE_SIZE', 'MEAN', 'STD', 'TRANSFORM']
+
+
+# Character set: lowercase letters (a-z) + digits (0-9), 36 characters total
+CHARS = string.ascii_lowercase + string.digits
+
+# Bidirectional mappings between characters and class indices
+CHAR_TO_IDX = {char: idx for idx, char in enumerate(CHARS)}
+IDX_TO_CHAR = {idx: char for idx, char in enumerate(CHARS)}
+
+# Model input size (height, width)
+IMAGE_SIZE = (64, 160)
+
+# ImageNet normalization statistics, used for better convergence
+MEAN = (0.485, 0.456, 0.406)
+STD = (0.229, 0.224, 0.225)
+
+# Image preprocessing pipeline for PIL images
+TRANSFORM = transforms.Compose([
+    transforms.Resize(IMAGE_SIZE),  # Resize to fixed dimensions
+    transforms.ToTensor(),          # Convert PIL image to tensor
+    transforms.Normalize(mean=MEAN, std=STD)
+])
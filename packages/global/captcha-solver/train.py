@@ -10,11 +10,53 @@ import torch.nn as nn
 import torch.optim as optim
 from torch.utils.data import random_split
 import os
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
 from model import CaptchaCNN
-from dataset import get_dataloader
+from dataset import get_dataset, loader_kwargs, IGNORE_INDEX
 
+__all__ = ['train_model', 'batch_metrics']
 
-def train_model(data_dir, epochs=50, batch_size=32, learning_rate=0.001):
+
+def batch_metrics(outputs, labels, criterion):
+    """
+    Compute loss and character accuracy for a batch in one vectorized pass.
+    
+    Positions labelled IGNORE_INDEX (past the end of shorter CAPTCHAs, or
+    characters outside the set) are excluded from both loss and accuracy.
+    
+    Args:
+        outputs (torch.Tensor): Model output of shape (batch_size, max_length, num_chars)
+        labels (torch.Tensor): Class indices of shape (batch_size, max_length)
+        criterion (nn.CrossEntropyLoss): Loss with reduction='sum' and
+                                         ignore_index=IGNORE_INDEX
+        
+    Returns:
+        tuple: (loss, correct, total)
+            - loss: Summed loss over all valid character positions
+            - correct: Number of correctly predicted characters
+            - total: Number of valid character positions
+            
+        All three are 0-dim tensors on the outputs' device, so callers can
+        accumulate them without a host sync per batch.
+    """
+    loss = criterion(outputs.reshape(-1, outputs.size(-1)), labels.reshape(-1))
+    mask = labels != IGNORE_INDEX
+    correct = ((outputs.argmax(dim=-1) == labels) & mask).sum()
+    total = mask.sum()
+    return loss, correct, total
+
+
+def _zero_metrics(device):
+    """Device-side (loss, correct, total) accumulators for one epoch phase."""
+    return (torch.zeros((), device=device),
+            torch.zeros((), dtype=torch.long, device=device),
+            torch.zeros((), dtype=torch.long, device=device))
+
+
+def train_model(data_dir, epochs=50, batch_size=32, learning_rate=0.001, use_amp=True,
+                compile_model=True, num_workers=None, accum_steps=1, fp16_checkpoint=True,
+                pooled_fc=False, batch_norm=False):
     """
     Train the CAPTCHA recognition model.
     
@@ -23,108 +65,172 @@ def train_model(data_dir, epochs=50, batch_size=32, learning_rate=0.001):
         epochs (int): Number of training epochs (default: 50)
         batch_size (int): Batch size for training (default: 32)
         learning_rate (float): Learning rate for Adam optimizer (default: 0.001)
+        use_amp (bool): Use FP16 mixed precision with gradient scaling when
+                        training on CUDA (default: True)
+        compile_model (bool): Compile the model with torch.compile
+                              (TorchInductor + CUDA graphs) when training
+                              on CUDA (default: True)
+        num_workers (int, optional): Training loader worker processes; the
+                                     validation loader uses half as many
+                                     (default: min(4, os.cpu_count()))
+        accum_steps (int): Micro-batches to accumulate gradients over before
+                           each optimizer step, for an effective batch of
+                           batch_size * accum_steps (default: 1)
+        fp16_checkpoint (bool): Store floating-point weights of the saved
+                                checkpoint in FP16, halving its size; they
+                                are cast back to FP32 on load (default: True)
+        pooled_fc (bool): Train CaptchaCNN with the pooled FC bottleneck
+                          instead of fc1/fc2 (default: False)
+        batch_norm (bool): Train CaptchaCNN with BatchNorm after each conv;
+                           usually converges in far fewer epochs (default: False)
         
     Returns:
         CaptchaCNN: Trained model instance
+        
+    Raises:
+        ValueError: If accum_steps is less than 1
     """
+    if accum_steps < 1:
+        raise ValueError(f"accum_steps must be at least 1, got {accum_steps}")
+    
     # Check for GPU availability
     print(f"CUDA available: {torch.cuda.is_available()}")
     device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
     print(f"Using device: {device}")
-    
+
+    if device.type == 'cuda':
+        # Run FP32 convs/matmuls on TF32 Tensor Cores (Ampere+), and let cuDNN
+        # autotune conv kernels once since the input shape never changes
+        torch.backends.cuda.matmul.allow_tf32 = True
+        torch.backends.cudnn.allow_tf32 = True
+        torch.set_float32_matmul_precision('high')
+        torch.backends.cudnn.benchmark = True
+
     # Load dataset
-    dataloader, dataset = get_dataloader(data_dir, batch_size=batch_size, shuffle=True)
+    dataset = get_dataset(data_dir)
     
     # Split dataset into training and validation sets (80/20 split)
     train_size = int(0.8 * len(dataset))
     val_size = len(dataset) - train_size
     train_dataset, val_dataset = random_split(dataset, [train_size, val_size])
     
-    # Create separate data loaders for training and validation
-    train_loader = torch.utils.data.DataLoader(train_dataset, batch_size=batch_size, shuffle=True)
-    val_loader = torch.utils.data.DataLoader(val_dataset, batch_size=batch_size, shuffle=False)
+    # Create separate data loaders for training and validation, decoding in
+    # worker processes and prefetching into pinned memory
+    train_kwargs = loader_kwargs(num_workers)
+    # Validation sees a fifth of the data once per epoch; half the workers suffice
+    val_kwargs = loader_kwargs(train_kwargs['num_workers'] // 2)
+    train_loader = torch.utils.data.DataLoader(train_dataset, batch_size=batch_size, shuffle=True,
+                                               **train_kwargs)
+    val_loader = torch.utils.data.DataLoader(val_dataset, batch_size=batch_size, shuffle=False,
+                                             **val_kwargs)
     
     # Initialize model, loss function, and optimizer
-    model = CaptchaCNN(num_chars=36, max_length=5).to(device)
-    criterion = nn.CrossEntropyLoss()
-    optimizer = optim.Adam(model.parameters(), lr=learning_rate)
+    # NHWC (channels_last) lets cuDNN pick Tensor Core conv kernels without
+    # layout transposes, which pairs with AMP below
+    model = CaptchaCNN(num_chars=36, max_length=5, pooled_fc=pooled_fc,
+                       batch_norm=batch_norm).to(device, memory_format=torch.channels_last)
+    # Keep the uncompiled module for checkpoints: the compiled wrapper
+    # prefixes state dict keys with "_orig_mod."
+    base_model = model
+    
+    # Input shapes are fixed (3x64x160), so the whole forward pass compiles
+    # into one graph; reduce-overhead replays it with CUDA graphs
+    if compile_model and device.type == 'cuda':
+        model = torch.compile(model, mode='reduce-overhead', fullgraph=True)
+    
+    # Summed over character positions (as the per-character loop used to do);
+    # padding positions are skipped via IGNORE_INDEX
+    criterion = nn.CrossEntropyLoss(reduction='sum', ignore_index=IGNORE_INDEX)
+    # Fused Adam updates every parameter in one CUDA kernel per step
+    optimizer = optim.Adam(model.parameters(), lr=learning_rate,
+                           fused=device.type == 'cuda')
+    
+    # Mixed precision: FP16 autocast + loss scaling (CUDA only)
+    use_amp = use_amp and device.type == 'cuda'
+    scaler = torch.cuda.amp.GradScaler(enabled=use_amp)
     
     # Track best validation accuracy for model checkpointing
     best_val_acc = 0.0
     
+    # Checkpoints are serialized on a background thread so disk writes
+    # overlap with the next epoch instead of stalling it
+    checkpoint_writer = ThreadPoolExecutor(max_workers=1)
+    pending_save = None
+    
+    # Skip gradient all-reduce on non-step micro-batches when the model is
+    # wrapped for distributed training (DDP exposes no_sync)
+    no_sync = getattr(model, 'no_sync', contextlib.nullcontext)
+    
+    # When the epoch doesn't divide evenly, the trailing micro-batches form a
+    # smaller group; its losses are averaged over its real size
+    num_batches = len(train_loader)
+    full_groups_end = num_batches - num_batches % accum_steps
+    
     # Training loop
     for epoch in range(epochs):
         # Training phase
         model.train()
-        train_loss = 0.0
-        train_correct = 0
-        train_total = 0
+        # Metrics stay on the device; they are read back once per epoch
+        train_loss, train_correct, train_total = _zero_metrics(device)
         
-        for images, labels, lengths in train_loader:
-            # Move data to device (GPU if available)
-            images, labels = images.to(device), labels.to(device)
+        for step, (images, labels, _) in enumerate(train_loader, 1):
+            # Move data to device (GPU if available); asynchronous from pinned memory
+            images = images.to(device, non_blocking=True, memory_format=torch.channels_last)
+            labels = labels.to(device, non_blocking=True)
             
-            # Zero gradients
-            optimizer.zero_grad()
+            # Step on every accum_steps-th micro-batch and on the last one
+            sync_step = step % accum_steps == 0 or step == num_batches
+            group_size = accum_steps if step <= full_groups_end else num_batches - full_groups_end
             
-            # Forward pass
-            outputs = model(images)  # Shape: (batch_size, max_length, num_chars)
-            
-            # Calculate loss and accuracy for variable-length CAPTCHAs
-            loss = 0
-            correct = 0
-            total = 0
+            with torch.autocast(device_type=device.type, dtype=torch.float16, enabled=use_amp):
+                # Forward pass
+                outputs = model(images)  # Shape: (batch_size, max_length, num_chars)
+                
+                # Calculate loss and accuracy for variable-length CAPTCHAs;
+                # padding positions carry IGNORE_INDEX and are masked out
+                loss, correct, total = batch_metrics(outputs, labels, criterion)
             
-            # Process each image in the batch
-            for i in range(labels.size(0)):
-                length = lengths[i].item()  # Actual CAPTCHA length
-                # Calculate loss for each character position
-                for j in range(length):
-                    # CrossEntropyLoss expects class indices, not one-hot encoding
-                    loss += criterion(outputs[i, j].unsqueeze(0), torch.argmax(labels[i, j]).unsqueeze(0))
-                    # Check if prediction matches label
-                    if torch.argmax(outputs[i, j]) == torch.argmax(labels[i, j]):
-                        correct += 1
-                    total += 1
+            # Backward pass (scaled to avoid FP16 underflow), averaging
+            # gradients over the accumulated micro-batches
+            with contextlib.nullcontext() if sync_step else no_sync():
+                scaler.scale(loss / group_size).backward()
             
-            # Backward pass and optimization
-            loss.backward()
-            optimizer.step()
+            if sync_step:
+                scaler.step(optimizer)
+                scaler.update()
+                # Drop gradients (set to None rather than memset to zero)
+                optimizer.zero_grad(set_to_none=True)
             
-            # Accumulate metrics
-            train_loss += loss.item()
+            # Accumulate metrics (no host sync)
+            train_loss += loss.detach()
             train_correct += correct
             train_total += total
         
         # Validation phase
         model.eval()
-        val_loss = 0.0
-        val_correct = 0
-        val_total = 0
         
-        # Disable gradient computation for validation
-        with torch.no_grad():
-            for images, labels, lengths in val_loader:
-                images, labels = images.to(device), labels.to(device)
-                outputs = model(images)
+        # Disable gradient computation and autograd bookkeeping for validation;
+        # torch.compile guards on grad mode and traces a separate graph for this
+        with torch.inference_mode():
+            val_loss, val_correct, val_total = _zero_metrics(device)
+            for images, labels, _ in val_loader:
+                images = images.to(device, non_blocking=True, memory_format=torch.channels_last)
+                labels = labels.to(device, non_blocking=True)
                 
-                # Calculate validation metrics
-                loss = 0
-                correct = 0
-                total = 0
+                with torch.autocast(device_type=device.type, dtype=torch.float16, enabled=use_amp):
+                    outputs = model(images)
+                    
+                    # Calculate validation metrics
+                    loss, correct, total = batch_metrics(outputs, labels, criterion)
                 
-                for i in range(labels.size(0)):
-                    length = lengths[i].item()
-                    for j in range(length):
-                        loss += criterion(outputs[i, j].unsqueeze(0), torch.argmax(labels[i, j]).unsqueeze(0))
-                        if torch.argmax(outputs[i, j]) == torch.argmax(labels[i, j]):
-                            correct += 1
-                        total += 1
-                
-                val_loss += loss.item()
+                val_loss += loss
                 val_correct += correct
                 val_total += total
         
+        # Single read-back of the epoch's metrics
+        train_loss, train_correct, train_total = train_loss.item(), train_correct.item(), train_total.item()
+        val_loss, val_correct, val_total = val_loss.item(), val_correct.item(), val_total.item()
+        
         # Calculate accuracies
         train_acc = train_correct / train_total if train_total > 0 else 0
         val_acc = val_correct / val_total if val_total > 0 else 0
@@ -138,10 +244,23 @@ def train_model(data_dir, epochs=50, batch_size=32, learning_rate=0.001):
         # Save model if validation accuracy improves
         if val_acc > best_val_acc:
             best_val_acc = val_acc
-            torch.save(model.state_dict(), 'best_captcha_model.pth')
+            # Snapshot the weights on CPU (copy=True so CPU training can't
+            # mutate them mid-write), optionally as FP16; integer buffers
+            # keep their dtype. The previous write must finish first
+            state_dict = {k: v.detach().to('cpu', copy=True,
+                                           dtype=torch.float16 if fp16_checkpoint and v.is_floating_point() else v.dtype)
+                          for k, v in base_model.state_dict().items()}
+            if pending_save is not None:
+                pending_save.result()
+            pending_save = checkpoint_writer.submit(torch.save, state_dict, 'best_captcha_model.pth')
             print(f'New best model saved with validation accuracy: {val_acc:.4f}')
     
-    return model
+    # Wait for the last checkpoint to hit disk (and surface any write error)
+    if pending_save is not None:
+        pending_save.result()
+    checkpoint_writer.shutdown()
+    
+    return base_model
 
 if __name__ == "__main__":
     # Training configuration